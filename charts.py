@@ -2,16 +2,11 @@
 """Generate charts for weekly summary emails."""
 
 import io
-from collections import defaultdict
 from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
 from zoneinfo import ZoneInfo
 
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
-
 from config import load_config
 
 # Priority colors — consistent across all charts
@@ -29,18 +24,47 @@ COLORS = {
 PRIORITY_ORDER = ["P0", "P1", "P2", "TOOLING", "META", "OFF-PRIORITY", "UNCLEAR"]
 
 
+def _prepare_figure(fig, size: tuple[float, float]):
+    """Return a blank figure of the given size, reusing fig if provided.
+
+    Uses matplotlib.figure.Figure directly (no pyplot state machine). The
+    matplotlib import is deferred so importing charts stays cheap.
+    """
+    if fig is None:
+        from matplotlib.figure import Figure
+
+        return Figure(figsize=size)
+    fig.clf()
+    fig.set_size_inches(size)
+    return fig
+
+
+@lru_cache(maxsize=32)
+def _parse_date(date_str: str) -> datetime:
+    """Parse a YYYY-MM-DD report date (naive)."""
+    return datetime.strptime(date_str, "%Y-%m-%d")
+
+
 def _get_tz() -> ZoneInfo:
     cfg = load_config()
     return ZoneInfo(cfg["timezone"])
 
 
+def _local_hour_table(date_str: str, tz: ZoneInfo) -> list[int]:
+    """Map each UTC hour (0-23) of a given date to its local hour."""
+    day_utc = _parse_date(date_str).replace(tzinfo=ZoneInfo("UTC"))
+    first = day_utc.astimezone(tz).utcoffset()
+    last = day_utc.replace(hour=23).astimezone(tz).utcoffset()
+    if first != last:
+        # DST transition during this day — convert each hour individually
+        return [day_utc.replace(hour=h).astimezone(tz).hour for h in range(24)]
+    offset_min = int(first.total_seconds() // 60)
+    return [(h * 60 + offset_min) // 60 % 24 for h in range(24)]
+
+
 def _utc_hour_to_local(utc_hour: int, date_str: str) -> int:
     """Convert a UTC hour to local hour for a given date."""
-    tz = _get_tz()
-    dt_utc = datetime.strptime(date_str, "%Y-%m-%d").replace(
-        hour=utc_hour, tzinfo=ZoneInfo("UTC")
-    )
-    return dt_utc.astimezone(tz).hour
+    return _local_hour_table(date_str, _get_tz())[utc_hour]
 
 
 def _ordered_priorities(all_priorities: set[str]) -> list[str]:
@@ -55,48 +79,70 @@ def _color(priority: str) -> str:
 
 
 def _fig_to_png(fig) -> bytes:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
     buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=150, bbox_inches="tight")
-    plt.close(fig)
-    buf.seek(0)
-    return buf.read()
+    FigureCanvasAgg(fig).print_figure(buf, format="png", dpi=150, bbox_inches="tight")
+    fig.clf()
+    return buf.getvalue()
 
 
 def _day_label(date_str: str) -> str:
     """Format date as 'Mon 02-13'."""
-    dt = datetime.strptime(date_str, "%Y-%m-%d")
-    return dt.strftime("%a %m-%d")
+    return _parse_date(date_str).strftime("%a %m-%d")
 
 
-def chart_by_hour_of_day(daily_reports: list[dict]) -> bytes:
+def chart_by_hour_of_day(daily_reports: list[dict], fig=None) -> bytes:
     """Stacked bar chart: turns by hour of day (local time), aggregated across the week."""
-    hour_totals: dict[int, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    tz = _get_tz()
+    entries: list[tuple[int, dict[str, int]]] = []
     all_priorities = set()
 
     for report in daily_reports:
         date_str = report.get("_date", "")
         if not date_str:
             continue
+        local_hours = _local_hour_table(date_str, tz)
         for entry in report.get("hourly_breakdown", []):
-            local_hour = _utc_hour_to_local(entry["hour"], date_str)
-            for p, turns in entry.get("priorities", {}).items():
-                hour_totals[local_hour][p] += turns
-                all_priorities.add(p)
+            local_hour = local_hours[entry["hour"]]
+            priorities_at_hour = entry.get("priorities", {})
+            entries.append((local_hour, priorities_at_hour))
+            all_priorities.update(priorities_at_hour.keys())
 
-    if not hour_totals:
+    if not all_priorities:
         return b""
 
-    tz = _get_tz()
-    priorities = _ordered_priorities(all_priorities)
-    hours = list(range(24))
+    import numpy as np
 
-    fig, ax = plt.subplots(figsize=(10, 4))
-    bottom = [0] * 24
-
-    for p in priorities:
-        values = [hour_totals[h].get(p, 0) for h in hours]
-        ax.bar(hours, values, bottom=bottom, label=p, color=_color(p), width=0.8)
-        bottom = [b + v for b, v in zip(bottom, values)]
+    priorities = _ordered_priorities(all_priorities)
+    priority_idx = {p: i for i, p in enumerate(priorities)}
+    hours = np.arange(24)
+
+    # Flatten to (hour, priority, turns) columns and scatter-add into a
+    # (24, P) grid; cumulative sums give each layer's bar bottom
+    cells = [
+        (local_hour, priority_idx[p], turns)
+        for local_hour, priorities_at_hour in entries
+        for p, turns in priorities_at_hour.items()
+    ]
+    cell_arr = np.array(cells, dtype=np.int64).reshape(-1, 3)
+    hour_col, priority_col, turns_col = cell_arr.T
+    totals = np.zeros((24, len(priorities)), dtype=np.int64)
+    np.add.at(totals, (hour_col, priority_col), turns_col)
+    bottoms = np.cumsum(totals, axis=1) - totals
+
+    fig = _prepare_figure(fig, (10, 4))
+    ax = fig.add_subplot()
+
+    for i, p in enumerate(priorities):
+        ax.bar(
+            hours,
+            totals[:, i],
+            bottom=bottoms[:, i],
+            label=p,
+            color=_color(p),
+            width=0.8,
+        )
 
     ax.set_xlabel(f"Hour of Day ({tz.key})")
     ax.set_ylabel("User Turns")
@@ -109,7 +155,7 @@ def chart_by_hour_of_day(daily_reports: list[dict]) -> bytes:
     return _fig_to_png(fig)
 
 
-def chart_by_day(daily_reports: list[dict]) -> bytes:
+def chart_by_day(daily_reports: list[dict], fig=None) -> bytes:
     """Stacked bar chart: turns by day."""
     all_priorities = set()
     day_data = []
@@ -125,17 +171,25 @@ def chart_by_day(daily_reports: list[dict]) -> bytes:
     if not day_data:
         return b""
 
+    import numpy as np
+
     priorities = _ordered_priorities(all_priorities)
     labels = [_day_label(d["date"]) for d in day_data]
     x = range(len(labels))
 
-    fig, ax = plt.subplots(figsize=(10, 4))
-    bottom = [0] * len(labels)
+    totals = np.array(
+        [[d["turns"].get(p, 0) for p in priorities] for d in day_data],
+        dtype=np.int64,
+    )
+    bottoms = np.cumsum(totals, axis=1) - totals
 
-    for p in priorities:
-        values = [d["turns"].get(p, 0) for d in day_data]
-        ax.bar(x, values, bottom=bottom, label=p, color=_color(p), width=0.6)
-        bottom = [b + v for b, v in zip(bottom, values)]
+    fig = _prepare_figure(fig, (10, 4))
+    ax = fig.add_subplot()
+
+    for i, p in enumerate(priorities):
+        ax.bar(
+            x, totals[:, i], bottom=bottoms[:, i], label=p, color=_color(p), width=0.6
+        )
 
     ax.set_xlabel("Date")
     ax.set_ylabel("User Turns")
@@ -148,7 +202,7 @@ def chart_by_day(daily_reports: list[dict]) -> bytes:
     return _fig_to_png(fig)
 
 
-def chart_time_series(daily_reports: list[dict]) -> bytes:
+def chart_time_series(daily_reports: list[dict], fig=None) -> bytes:
     """Time series: stacked area of turns per hour across the entire week (local time)."""
     tz = _get_tz()
     all_priorities = set()
@@ -158,29 +212,35 @@ def chart_time_series(daily_reports: list[dict]) -> bytes:
         date_str = report.get("_date", "")
         if not date_str:
             continue
-        base_date = datetime.strptime(date_str, "%Y-%m-%d").replace(
-            tzinfo=ZoneInfo("UTC")
-        )
+        base_date = _parse_date(date_str).replace(tzinfo=ZoneInfo("UTC"))
+        # Points stay as UTC instants; the axis locator/formatter render them
+        # in local time, so no per-entry astimezone() is needed.
         for entry in report.get("hourly_breakdown", []):
-            hour = entry["hour"]
-            dt_local = base_date.replace(hour=hour).astimezone(tz)
+            dt_utc = base_date + timedelta(hours=entry["hour"])
             priorities = entry.get("priorities", {})
             all_priorities.update(priorities.keys())
-            time_points.append((dt_local, priorities))
+            time_points.append((dt_utc, priorities))
 
     if not time_points:
         return b""
 
-    time_points.sort(key=lambda x: x[0])
+    import matplotlib.dates as mdates
+    import numpy as np
+
+    time_points.sort(key=itemgetter(0))
     priorities = _ordered_priorities(all_priorities)
     times = [t[0] for t in time_points]
 
-    fig, ax = plt.subplots(figsize=(12, 4))
+    fig = _prepare_figure(fig, (12, 4))
+    ax = fig.add_subplot()
 
-    series = {p: [tp[1].get(p, 0) for tp in time_points] for p in priorities}
+    series = np.array(
+        [[tp[1].get(p, 0) for tp in time_points] for p in priorities],
+        dtype=np.int64,
+    )
     ax.stackplot(
         times,
-        *[series[p] for p in priorities],
+        series,
         labels=priorities,
         colors=[_color(p) for p in priorities],
         alpha=0.8,
@@ -189,8 +249,8 @@ def chart_time_series(daily_reports: list[dict]) -> bytes:
     ax.set_xlabel(f"Date ({tz.key})")
     ax.set_ylabel("User Turns")
     ax.set_title("Activity Over Time")
-    ax.xaxis.set_major_formatter(mdates.DateFormatter("%a %m-%d"))
-    ax.xaxis.set_major_locator(mdates.DayLocator())
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%a %m-%d", tz=tz))
+    ax.xaxis.set_major_locator(mdates.DayLocator(tz=tz))
     ax.legend(loc="upper left", fontsize=8, ncol=len(priorities))
     fig.autofmt_xdate()
     fig.tight_layout()
@@ -200,17 +260,20 @@ def chart_time_series(daily_reports: list[dict]) -> bytes:
 
 def generate_all_charts(daily_reports: list[dict]) -> dict[str, bytes]:
     """Generate all charts, returning {name: png_bytes}."""
+    from matplotlib.figure import Figure
+
     charts = {}
+    fig = Figure()
 
-    png = chart_by_hour_of_day(daily_reports)
+    png = chart_by_hour_of_day(daily_reports, fig)
     if png:
         charts["hourly"] = png
 
-    png = chart_by_day(daily_reports)
+    png = chart_by_day(daily_reports, fig)
     if png:
         charts["daily"] = png
 
-    png = chart_time_series(daily_reports)
+    png = chart_time_series(daily_reports, fig)
     if png:
         charts["timeseries"] = png
 
@@ -1,5 +1,6 @@
 """Load configuration from config.yaml."""
 
+from functools import lru_cache
 from pathlib import Path
 
 import yaml
@@ -8,8 +9,12 @@ CONFIG_PATH = Path(__file__).parent / "config.yaml"
 EXAMPLE_PATH = Path(__file__).parent / "config.example.yaml"
 
 
+@lru_cache(maxsize=1)
 def load_config() -> dict:
-    """Load config.yaml, falling back to defaults."""
+    """Load config.yaml, falling back to defaults.
+
+    Parsed once per process; callers must treat the returned dict as read-only.
+    """
     if not CONFIG_PATH.exists():
         raise FileNotFoundError(
             f"No config.yaml found. Copy config.example.yaml to config.yaml and edit it:\n"
@@ -31,6 +36,8 @@ def load_config() -> dict:
         ),
         "projects": [_expand(p) for p in cfg.get("projects", [])],
         "timezone": cfg.get("timezone", "US/Pacific"),
+        "opus_cache_days": cfg.get("opus_cache_days", 7),
+        "haiku_cache_days": cfg.get("haiku_cache_days", 30),
     }
 
 
@@ -7,24 +7,77 @@ Saves to reports_dir/daily/ and optionally emails.
 
 import argparse
 import json
+import os
 import subprocess
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
 from datetime import datetime, timedelta
+from operator import itemgetter
 from pathlib import Path
 
 from config import load_config
+from jsonio import dumps_compact, dumps_report
 from sessions import (
     chunk_conversation,
     extract_messages,
     get_sessions,
     load_priorities,
+    run_claude,
     setup_oauth_env,
     summarize_and_tag_chunk,
 )
 
 setup_oauth_env()
 
+OPUS_CACHE_DIR = ".opus_cache"
+
+
+def _cached_opus(
+    prompt: str, timeout: int = 600, cacheable: Callable[[str], bool] | None = None
+) -> str:
+    """Run a prompt through Opus, reusing the stored response for identical prompts.
+
+    Responses live in reports_dir/.opus_cache keyed by prompt hash and expire
+    after opus_cache_days (0 disables caching). Empty or failed responses, and
+    any that cacheable rejects, aren't cached.
+    """
+    cfg = load_config()
+    cache_dir = cfg["reports_dir"] / OPUS_CACHE_DIR
+    return run_claude(
+        prompt, "opus", timeout, cache_dir, cfg["opus_cache_days"], cacheable
+    )
+
+
+def _parse_json_array(text: str) -> list:
+    """Decode the first JSON array in text, ignoring code fences or prose around it."""
+    decoder = json.JSONDecoder()
+    start = text.find("[")
+    while start != -1:
+        try:
+            groups, _ = decoder.raw_decode(text, start)
+            return groups
+        except json.JSONDecodeError:
+            # A bracket in leading prose; try the next one
+            start = text.find("[", start + 1)
+    raise ValueError("no JSON array in response")
+
+
+def _is_json_array(text: str) -> bool:
+    """True if _parse_json_array can decode text."""
+    try:
+        _parse_json_array(text)
+    except ValueError:
+        return False
+    return True
+
 
 def consolidate_priority_names(
     breakdown: list[dict], total_turns: int, warnings: list[str] | None = None
@@ -59,31 +112,12 @@ Consolidate aggressively - similar work should be grouped even if descriptions d
 
     try:
         print("Consolidating priority names with Opus...", file=sys.stderr)
-        result = subprocess.run(
-            ["claude", "-p", "--model", "opus", prompt],
-            capture_output=True,
-            text=True,
-            timeout=600,
-        )
-        output = result.stdout.strip()
+        output = _cached_opus(prompt, cacheable=_is_json_array)
 
         if not output:
-            print(
-                f"Opus returned empty output. stderr: {result.stderr[:500]}",
-                file=sys.stderr,
-            )
             return breakdown
 
-        # Parse JSON from response (handle markdown code blocks)
-        if "```" in output:
-            parts = output.split("```")
-            if len(parts) >= 2:
-                output = parts[1]
-                if output.startswith("json"):
-                    output = output[4:]
-                output = output.strip()
-
-        groups = json.loads(output)
+        groups = _parse_json_array(output)
 
         # Sum turns ourselves from the original data
         seen_indices = set()
@@ -107,7 +141,7 @@ Consolidate aggressively - similar work should be grouped even if descriptions d
             if i not in seen_indices:
                 consolidated.append(item)
 
-        consolidated.sort(key=lambda x: -x["turns"])
+        consolidated.sort(key=itemgetter("turns"), reverse=True)
 
         consolidated_turns = sum(c["turns"] for c in consolidated)
         original_turns = sum(b["turns"] for b in breakdown)
@@ -124,39 +158,38 @@ Consolidate aggressively - similar work should be grouped even if descriptions d
         return breakdown
 
 
-def consolidate_with_opus(
-    projects: list[dict],
-    priorities: str,
-    warnings: list[str] | None = None,
-    git_logs: dict[str, str] | None = None,
-    todos: dict[str, str] | None = None,
-) -> list[dict]:
-    """Use Opus to create high-quality consolidated summaries for top projects."""
-    consolidated = []
-    failed_count = 0
+def _match_project(project: str, by_name: dict[str, str] | None) -> str | None:
+    """Find the entry for a session project in a {repo_name: text} dict.
+
+    Tries an O(1) lookup on the project's basename first, then falls back to
+    the first repo name that appears anywhere in the project path.
+    """
+    if not by_name:
+        return None
+    text = by_name.get(project.rsplit("/", 1)[-1])
+    if text is not None:
+        return text
+    return next((t for name, t in by_name.items() if name in project), None)
 
-    for proj in projects[:10]:
-        raw_summaries = "\n\n".join(proj["summaries"])
-
-        if not raw_summaries.strip() or raw_summaries == "(no content)":
-            consolidated.append(proj)
-            continue
-
-        # Find matching git log and TODOs by project name
-        proj_name = proj["project"].split("/")[-1]
-        extra_context = ""
-        if git_logs:
-            for name, log in git_logs.items():
-                if name in proj["project"] or proj_name == name:
-                    extra_context += f"\n## Git Commits\n{log}\n"
-                    break
-        if todos:
-            for name, todo_text in todos.items():
-                if name in proj["project"] or proj_name == name:
-                    extra_context += f"\n## Current TODOs\n{todo_text}\n"
-                    break
-
-        prompt = f"""You are consolidating summaries of Claude Code sessions for an activity report.
+
+def _consolidate_project(
+    proj: dict,
+    raw_summaries: str,
+    priorities: str,
+    git_logs: dict[str, str] | None,
+    todos: dict[str, str] | None,
+) -> dict:
+    """Run a single Opus consolidation call for one project."""
+    # Find matching git log and TODOs by project name
+    extra_context = ""
+    log = _match_project(proj["project"], git_logs)
+    if log:
+        extra_context += f"\n## Git Commits\n{log}\n"
+    todo_text = _match_project(proj["project"], todos)
+    if todo_text:
+        extra_context += f"\n## Current TODOs\n{todo_text}\n"
+
+    prompt = f"""You are consolidating summaries of Claude Code sessions for an activity report.
 
 ## Your Priorities Reference
 {priorities}
@@ -179,30 +212,50 @@ Write 3-5 plain text bullet points of the substantive work done on this project.
 - If the summaries are mostly empty or just initialization, write a single bullet: "No substantive work captured"
 """
 
-        try:
-            result = subprocess.run(
-                ["claude", "-p", "--model", "opus", prompt],
-                capture_output=True,
-                text=True,
-                timeout=600,
-            )
-            consolidated_summary = result.stdout.strip()
-            consolidated.append(
-                {
-                    "project": proj["project"],
-                    "chars": proj["chars"],
-                    "summaries": [consolidated_summary],
-                }
-            )
-            print(f"Consolidated: {proj['project'][:50]}", file=sys.stderr)
-        except Exception as e:
-            print(
-                f"Opus consolidation failed for {proj['project']}: {e}", file=sys.stderr
+    return {
+        "project": proj["project"],
+        "chars": proj["chars"],
+        "summaries": [_cached_opus(prompt)],
+    }
+
+
+def consolidate_with_opus(
+    projects: list[dict],
+    priorities: str,
+    warnings: list[str] | None = None,
+    git_logs: dict[str, str] | None = None,
+    todos: dict[str, str] | None = None,
+) -> list[dict]:
+    """Use Opus to create high-quality consolidated summaries for top projects."""
+    top = projects[:10]
+    # One copy of the whole list; consolidated results overwrite the top slots
+    consolidated = list(projects)
+    failed_count = 0
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        futures = {}
+        for i, proj in enumerate(top):
+            raw_summaries = "\n\n".join(proj["summaries"])
+            if not raw_summaries.strip() or raw_summaries == "(no content)":
+                continue
+            future = executor.submit(
+                _consolidate_project, proj, raw_summaries, priorities, git_logs, todos
             )
-            failed_count += 1
-            consolidated.append(proj)
+            futures[future] = i
+
+        for future in as_completed(futures):
+            i = futures[future]
+            proj = top[i]
+            try:
+                consolidated[i] = future.result()
+                print(f"Consolidated: {proj['project'][:50]}", file=sys.stderr)
+            except Exception as e:
+                print(
+                    f"Opus consolidation failed for {proj['project']}: {e}",
+                    file=sys.stderr,
+                )
+                failed_count += 1
 
-    consolidated.extend(projects[10:])
     if failed_count and warnings is not None:
         warnings.append(
             f"Project summary consolidation failed for {failed_count} project(s)"
@@ -210,115 +263,123 @@ Write 3-5 plain text bullet points of the substantive work done on this project.
     return consolidated
 
 
+def _git_log(project_path: Path, hours: int) -> str:
+    """One-line git log for a repo over the last N hours, or "" on failure."""
+    try:
+        result = subprocess.run(
+            [
+                "git",
+                "-C",
+                str(project_path),
+                "log",
+                f"--since={hours} hours ago",
+                "--oneline",
+                "--all",
+            ],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except Exception:
+        return ""
+    return result.stdout.strip()
+
+
+def _project_dirs() -> list[Path]:
+    """Configured project dirs (already Paths), or git repos under ~/code."""
+    projects = load_config()["projects"]
+    if projects:
+        return projects
+    code_dir = Path.home() / "code"
+    if not code_dir.exists():
+        return []
+    return [p for p in code_dir.iterdir() if (p / ".git").exists()]
+
+
 def collect_git_logs(hours: int) -> dict[str, str]:
     """Collect git logs from configured projects for the given time window."""
-    cfg = load_config()
-    projects = cfg["projects"]
+    repos = [p for p in _project_dirs() if (p / ".git").exists()]
 
-    if not projects:
-        # Fallback: scan ~/code/
-        code_dir = Path.home() / "code"
-        if code_dir.exists():
-            projects = [p for p in code_dir.iterdir() if (p / ".git").exists()]
+    # git log per repo is independent; map keeps the original repo order
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        outputs = list(executor.map(_git_log, repos, [hours] * len(repos)))
 
     logs = {}
-    for project_path in projects:
-        project_path = (
-            Path(project_path) if not isinstance(project_path, Path) else project_path
-        )
-        if not (project_path / ".git").exists():
-            continue
-        name = project_path.name
-        try:
-            result = subprocess.run(
-                [
-                    "git",
-                    "-C",
-                    str(project_path),
-                    "log",
-                    f"--since={hours} hours ago",
-                    "--oneline",
-                    "--all",
-                ],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            if result.stdout.strip():
-                logs[name] = result.stdout.strip()
-        except Exception:
-            continue
+    for project_path, output in zip(repos, outputs):
+        if output:
+            logs[project_path.name] = output
     return logs
 
 
 def collect_todos() -> dict[str, str]:
     """Collect TODO files from configured projects."""
-    cfg = load_config()
-    projects = cfg["projects"]
-    todo_filenames = cfg["todo_filenames"]
-
-    if not projects:
-        code_dir = Path.home() / "code"
-        if code_dir.exists():
-            projects = [p for p in code_dir.iterdir() if (p / ".git").exists()]
+    todo_filenames = load_config()["todo_filenames"]
 
     todos = {}
-    for project_path in projects:
-        project_path = (
-            Path(project_path) if not isinstance(project_path, Path) else project_path
-        )
-        name = project_path.name
+    for project_path in _project_dirs():
         project_todos = []
         for fname in todo_filenames:
-            fpath = project_path / fname
-            if fpath.exists():
-                project_todos.append(f"[{fname}]\n{fpath.read_text()}")
+            try:
+                text = (project_path / fname).read_text()
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            project_todos.append(f"[{fname}]\n{text}")
         if project_todos:
-            todos[name] = "\n\n".join(project_todos)
+            todos[project_path.name] = "\n\n".join(project_todos)
     return todos
 
 
-def process_session(args) -> dict | None:
-    """Process a single session, filtering by time window."""
-    session, project, priorities, start, end = args
+def parse_session(
+    session_path: str, start: datetime, end: datetime
+) -> tuple[list[list[dict]], list[int | None]] | None:
+    """Extract in-window messages and split them into chunks.
 
-    messages = extract_messages(session["path"], with_timestamps=True)
-    filtered = [m for m in messages if start <= m["timestamp"] <= end]
+    CPU-bound (JSON decoding); runs in a worker process. Returns the chunks
+    plus each chunk's median user-message hour, or None if the session has
+    no messages in the window.
+    """
+    filtered = extract_messages(session_path, start=start, end=end)
 
     if not filtered:
         return None
 
-    messages_with_ts = filtered
-    messages_plain = [{"role": m["role"], "text": m["text"]} for m in filtered]
+    # chunk_conversation only reads role/text, so the timestamped dicts can
+    # be chunked as-is instead of copied
+    chunks = chunk_conversation(filtered)
+    chunk_hours = []
 
-    chunks = chunk_conversation(messages_plain)
-    chunk_results = []
+    # Positions of user messages; chunks are contiguous slices of messages,
+    # so each chunk's user messages are a contiguous run of this list
+    user_indices = [i for i, m in enumerate(filtered) if m["role"] == "user"]
 
     msg_idx = 0
     for chunk in chunks:
-        chunk_start_idx = msg_idx
-        chunk_end_idx = msg_idx + len(chunk) - 1
+        lo = bisect_left(user_indices, msg_idx)
+        hi = bisect_left(user_indices, msg_idx + len(chunk))
 
-        chunk_timestamps = [
-            messages_with_ts[i]["timestamp"]
-            for i in range(
-                chunk_start_idx, min(chunk_end_idx + 1, len(messages_with_ts))
-            )
-            if messages_with_ts[i]["role"] == "user"
-        ]
-
-        if chunk_timestamps:
-            median_ts = chunk_timestamps[len(chunk_timestamps) // 2]
-            chunk_hour = median_ts.hour
+        if hi > lo:
+            median_ts = filtered[user_indices[(lo + hi) // 2]]["timestamp"]
+            chunk_hours.append(median_ts.hour)
         else:
-            chunk_hour = None
-
-        result = summarize_and_tag_chunk(chunk, project, priorities)
-        result["hour"] = chunk_hour
-        chunk_results.append(result)
+            chunk_hours.append(None)
 
         msg_idx += len(chunk)
 
+    return chunks, chunk_hours
+
+
+def _session_result(
+    project: str,
+    chunk_futures: list[Future],
+    chunk_hours: list[int | None],
+) -> dict:
+    """Combine a session's per-chunk Haiku tags (waits for each chunk)."""
+    chunk_results = []
+    for future, chunk_hour in zip(chunk_futures, chunk_hours):
+        # Copy: identical chunks share one future (and one result dict)
+        result = {**future.result(), "hour": chunk_hour}
+        chunk_results.append(result)
+
     all_summaries = [r["summary"] for r in chunk_results if r["summary"]]
     combined = "\n".join(all_summaries) if all_summaries else "(no content)"
 
@@ -335,7 +396,10 @@ def generate_report(start: datetime, end: datetime) -> dict:
     """Generate report for the given time window."""
     warnings: list[str] = []
     priorities = load_priorities()
-    sessions = get_sessions()
+    # A session last written before the window opened can't contain messages
+    # inside it; the hour of slack covers clock skew between mtime and
+    # message timestamps
+    sessions = get_sessions(since=start - timedelta(hours=1))
 
     hours = int((end - start).total_seconds() / 3600)
     print("Collecting git logs and TODOs...", file=sys.stderr)
@@ -347,34 +411,59 @@ def generate_report(start: datetime, end: datetime) -> dict:
         file=sys.stderr,
     )
 
-    tasks = [(s, s["project"], priorities, start, end) for s in sessions]
     results = []
 
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = {executor.submit(process_session, task): task for task in tasks}
-        completed = 0
-
-        for future in as_completed(futures):
-            completed += 1
-            result = future.result()
-            if result:
-                results.append(result)
-                print(
-                    f"[{completed}/{len(tasks)}] {result['project'][:40]} - {result['total_user_chars']} chars",
-                    file=sys.stderr,
-                )
-            else:
-                if completed % 50 == 0:
-                    print(f"[{completed}/{len(tasks)}] (scanning...)", file=sys.stderr)
+    # Parsing is CPU-bound (processes); Haiku tagging is I/O-bound (threads).
+    # Each chunk is tagged as its own task as soon as its session is parsed,
+    # so one long session doesn't serialize its chunks behind a single worker.
+    with (
+        ProcessPoolExecutor() as parse_pool,
+        ThreadPoolExecutor(max_workers=20) as tag_pool,
+    ):
+        parse_futures = {
+            parse_pool.submit(parse_session, s["path"], start, end): s for s in sessions
+        }
+        tagged_sessions = []
+        # Identical chunks (same project and messages) share one Haiku call
+        chunk_tasks: dict[tuple, Future] = {}
+        scanned = 0
+
+        for future in as_completed(parse_futures):
+            scanned += 1
+            parsed = future.result()
+            if parsed:
+                project = parse_futures[future]["project"]
+                chunks, chunk_hours = parsed
+                chunk_futures = []
+                for c in chunks:
+                    key = (project, *((m["role"], m["text"]) for m in c))
+                    if key not in chunk_tasks:
+                        chunk_tasks[key] = tag_pool.submit(
+                            summarize_and_tag_chunk, c, project, priorities
+                        )
+                    chunk_futures.append(chunk_tasks[key])
+                tagged_sessions.append((project, chunk_futures, chunk_hours))
+            elif scanned % 50 == 0:
+                print(f"[{scanned}/{len(sessions)}] (scanning...)", file=sys.stderr)
+
+        for completed, tagged in enumerate(tagged_sessions, 1):
+            result = _session_result(*tagged)
+            results.append(result)
+            print(
+                f"[{completed}/{len(tagged_sessions)}] {result['project'][:40]} - {result['total_user_chars']} chars",
+                file=sys.stderr,
+            )
 
     # Aggregate priority metrics
-    priority_chars: dict[str, int] = {}
-    priority_turns: dict[str, int] = {}
-    priority_chunks: dict[str, int] = {}
-    priority_name_turns: dict[str, int] = {}
+    priority_chars: dict[str, int] = defaultdict(int)
+    priority_turns: dict[str, int] = defaultdict(int)
+    priority_chunks: dict[str, int] = defaultdict(int)
+    priority_name_turns: dict[str, int] = defaultdict(int)
     total_chars = 0
     total_turns = 0
-    hourly_priority_turns: dict[int, dict[str, int]] = {h: {} for h in range(24)}
+    hourly_priority_turns: dict[int, dict[str, int]] = {
+        h: defaultdict(int) for h in range(24)
+    }
 
     for r in results:
         for chunk in r.get("chunks", []):
@@ -384,17 +473,15 @@ def generate_report(start: datetime, end: datetime) -> dict:
             hour = chunk.get("hour")
             name = f"{p}: {chunk.get('priority_name', 'unknown')}"
 
-            priority_chars[p] = priority_chars.get(p, 0) + chars
-            priority_turns[p] = priority_turns.get(p, 0) + turns
-            priority_chunks[p] = priority_chunks.get(p, 0) + 1
-            priority_name_turns[name] = priority_name_turns.get(name, 0) + turns
+            priority_chars[p] += chars
+            priority_turns[p] += turns
+            priority_chunks[p] += 1
+            priority_name_turns[name] += turns
             total_chars += chars
             total_turns += turns
 
             if hour is not None:
-                hourly_priority_turns[hour][p] = (
-                    hourly_priority_turns[hour].get(p, 0) + turns
-                )
+                hourly_priority_turns[hour][p] += turns
 
     priority_pct = {
         p: round(100 * t / total_turns, 1) if total_turns > 0 else 0
@@ -410,7 +497,8 @@ def generate_report(start: datetime, end: datetime) -> dict:
             }
             for k, v in priority_name_turns.items()
         ],
-        key=lambda x: -x["turns"],
+        key=itemgetter("turns"),
+        reverse=True,
     )
 
     raw_priority_name_breakdown = priority_name_breakdown
@@ -432,14 +520,15 @@ def generate_report(start: datetime, end: datetime) -> dict:
             {"project": k, "chars": v["chars"], "summaries": v["summaries"]}
             for k, v in by_project.items()
         ],
-        key=lambda x: -x["chars"],
+        key=itemgetter("chars"),
+        reverse=True,
     )
 
     print("Consolidating project summaries with Opus...", file=sys.stderr)
     projects = consolidate_with_opus(projects, priorities, warnings, git_logs, todos)
 
     hourly_breakdown = [
-        {"hour": h, "priorities": priorities_at_hour}
+        {"hour": h, "priorities": dict(priorities_at_hour)}
         for h, priorities_at_hour in hourly_priority_turns.items()
         if sum(priorities_at_hour.values()) > 0
     ]
@@ -449,9 +538,9 @@ def generate_report(start: datetime, end: datetime) -> dict:
         "period_end": end.isoformat(),
         "total_sessions_with_activity": len(results),
         "priority_breakdown": {
-            "by_user_turns": priority_turns,
-            "by_user_chars": priority_chars,
-            "by_chunk_count": priority_chunks,
+            "by_user_turns": dict(priority_turns),
+            "by_user_chars": dict(priority_chars),
+            "by_chunk_count": dict(priority_chunks),
             "percentage_of_effort": priority_pct,
             "by_priority_name": priority_name_breakdown,
             "by_priority_name_raw": raw_priority_name_breakdown,
@@ -466,8 +555,10 @@ def generate_report(start: datetime, end: datetime) -> dict:
     }
 
 
-def save_report(report: dict, report_type: str, date: datetime):
-    """Save report to reports_dir."""
+def save_report(
+    report: dict, report_type: str, date: datetime, data: bytes | None = None
+):
+    """Save report to reports_dir. `data` is dumps_report(report) if already built."""
     cfg = load_config()
     reports_dir = cfg["reports_dir"]
 
@@ -477,8 +568,11 @@ def save_report(report: dict, report_type: str, date: datetime):
     filename = date.strftime("%Y-%m-%d") + ".json"
     filepath = dir_path / filename
 
-    with open(filepath, "w") as f:
-        json.dump(report, f, indent=2)
+    # Write-then-rename so a crash mid-write never leaves a truncated report
+    # (the .json.tmp name never matches weekly_summary's ????-??-??.json glob)
+    tmp_path = filepath.with_suffix(".json.tmp")
+    tmp_path.write_bytes(dumps_report(report) if data is None else data)
+    os.replace(tmp_path, filepath)
 
     print(f"Saved to {filepath}", file=sys.stderr)
 
@@ -488,14 +582,13 @@ def save_report(report: dict, report_type: str, date: datetime):
     hourly_file = hourly_dir / "timeseries.jsonl"
 
     date_str = date.strftime("%Y-%m-%d")
-    with open(hourly_file, "a") as f:
-        for entry in report.get("hourly_breakdown", []):
-            row = {
-                "date": date_str,
-                "hour": entry["hour"],
-                **entry["priorities"],
-            }
-            f.write(json.dumps(row) + "\n")
+    rows = b"".join(
+        dumps_compact({"date": date_str, "hour": entry["hour"], **entry["priorities"]})
+        + b"\n"
+        for entry in report.get("hourly_breakdown", [])
+    )
+    with open(hourly_file, "ab") as f:
+        f.write(rows)
 
     print(f"Appended hourly data to {hourly_file}", file=sys.stderr)
     return filepath
@@ -533,13 +626,7 @@ Do not include preamble or headers. Just bullets or NONE."""
 
     try:
         print("Checking for neglected priorities...", file=sys.stderr)
-        result = subprocess.run(
-            ["claude", "-p", "--model", "opus", prompt],
-            capture_output=True,
-            text=True,
-            timeout=600,
-        )
-        output = result.stdout.strip()
+        output = _cached_opus(prompt)
 
         if not output or output == "NONE":
             return ""
@@ -598,7 +685,7 @@ def email_report(report: dict, subject: str, email: str):
         "## Priority Breakdown (by turns)",
     ]
 
-    for p, val in sorted(pct.items(), key=lambda x: -x[1]):
+    for p, val in sorted(pct.items(), key=itemgetter(1), reverse=True):
         if val > 0:
             lines.append(f"- **{p}**: {val}%")
 
@@ -664,10 +751,12 @@ def main():
         start = end - timedelta(hours=args.hours)
 
     report = generate_report(start, end)
+    # Serialized once for both the saved file and stdout
+    data = dumps_report(report)
 
     if not args.no_save:
         save_date = datetime.strptime(args.date, "%Y-%m-%d") if args.date else end
-        save_report(report, "daily", save_date)
+        save_report(report, "daily", save_date, data)
 
     if args.email:
         if args.hours <= 24:
@@ -677,7 +766,8 @@ def main():
             subject = f"Claude Report ({days:.0f} days): {end.strftime('%Y-%m-%d')}"
         email_report(report, subject, args.email)
 
-    print(json.dumps(report, indent=2))
+    sys.stdout.flush()
+    sys.stdout.buffer.write(data + b"\n")
 
 
 if __name__ == "__main__":
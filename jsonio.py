@@ -0,0 +1,28 @@
+"""JSON encode/decode helpers, using orjson when it's installed."""
+
+import json
+
+# Decodes bytes or str; both raise a ValueError subclass on bad input
+try:
+    import orjson
+
+    json_loads = orjson.loads
+except ImportError:  # optional speedup; stdlib json is fine
+    orjson = None
+    json_loads = json.loads
+
+
+def dumps_report(report: dict) -> bytes:
+    """Serialize a report as indented JSON."""
+    if orjson is not None:
+        return orjson.dumps(
+            report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(report, indent=2).encode()
+
+
+def dumps_compact(obj) -> bytes:
+    """Serialize as single-line JSON without whitespace."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":")).encode()
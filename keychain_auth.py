@@ -9,6 +9,7 @@ See README.md for setup instructions.
 
 import json
 import subprocess
+from functools import lru_cache
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -77,7 +78,11 @@ def get_credentials(scopes=None):
     return creds
 
 
+@lru_cache(maxsize=1)
 def get_gmail_service():
-    """Get authenticated Gmail service."""
+    """Get authenticated Gmail service (built once per process).
+
+    The client refreshes the access token itself if it expires later.
+    """
     creds = get_credentials(GMAIL_SCOPES)
     return build("gmail", "v1", credentials=creds)
@@ -7,6 +7,7 @@ import sys
 from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from functools import lru_cache
 
 import markdown
 
@@ -26,9 +27,15 @@ hr { border: none; border-top: 1px solid #ddd; margin: 1.5em 0; }
 """
 
 
+@lru_cache(maxsize=1)
+def _markdown() -> markdown.Markdown:
+    """Shared converter, built on first use so importing this module stays cheap."""
+    return markdown.Markdown(extensions=["fenced_code", "tables"])
+
+
 def md_to_html(body: str, html_prefix: str = "", html_suffix: str = "") -> str:
     """Convert markdown body to styled HTML, with optional pre/post HTML."""
-    html_body = markdown.markdown(body, extensions=["fenced_code", "tables"])
+    html_body = _markdown().reset().convert(body)
     return f"<html><head>{STYLE}</head><body>{html_prefix}{html_body}{html_suffix}</body></html>"
 
 
@@ -1,12 +1,41 @@
 """Shared session extraction, scanning, and tagging utilities."""
 
+import hashlib
 import json
+import mmap
 import os
+import re
 import subprocess
-from datetime import datetime
+import sys
+import time
+from collections.abc import Callable, Iterator
+from datetime import UTC, datetime
+from functools import cache, lru_cache
+from operator import itemgetter
 from pathlib import Path
 
 from config import load_config
+from jsonio import json_loads
+
+# Cheap pre-filters for user (or user/assistant) entries in session JSONL.
+# JSON pasted into message text is escaped (\"type\") and never matches, but
+# nested objects in progress or tool payloads can, so callers confirm a hit
+# by decoding the line.
+_TYPE_USER_RE = re.compile(rb'"type":\s?"user"')
+_TYPE_MESSAGE_RE = re.compile(rb'"type":\s?"(?:user|assistant)"')
+# A message can only yield text if it has a text block or string content;
+# tool_use-only entries have neither and are skipped undecoded
+_TEXT_CONTENT_RE = re.compile(rb'"type":\s?"text"|"content":\s?"')
+
+# Session files run to many MB; read them in large blocks rather than the
+# default block-size buffer
+READ_BUFFER_SIZE = 1 << 20
+
+# Per-file user-turn counts keyed by (mtime_ns, size), stored under reports_dir
+SESSION_CACHE_NAME = ".session_cache.json"
+
+# Haiku chunk responses keyed by prompt hash, stored under reports_dir
+HAIKU_CACHE_DIR = ".haiku_cache"
 
 # OAuth token setup — call explicitly from entry points
 OAUTH_TOKEN_FILE = Path.home() / ".ssh" / "claude-oauth-token"
@@ -18,6 +47,101 @@ def setup_oauth_env():
         os.environ["CLAUDE_CODE_OAUTH_TOKEN"] = OAUTH_TOKEN_FILE.read_text().strip()
 
 
+def run_claude(
+    prompt: str,
+    model: str,
+    timeout: int,
+    cache_dir: Path | None = None,
+    max_age_days: float = 0,
+    cacheable: Callable[[str], bool] | None = None,
+) -> str:
+    """Run a prompt through `claude -p`, reusing the stored response if cached.
+
+    Responses live in cache_dir keyed by prompt hash and expire after
+    max_age_days (no cache_dir or 0 disables caching). Only non-empty output
+    from a successful run is stored, and only if cacheable(output) accepts it,
+    so a transient API error isn't replayed until it expires.
+    """
+    cache_file = None
+    max_age = max_age_days * 86400
+    if cache_dir is not None and max_age > 0:
+        key = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+        cache_file = cache_dir / f"{key}.txt"
+        try:
+            if time.time() - cache_file.stat().st_mtime < max_age:
+                return cache_file.read_text()
+        except OSError:
+            pass
+
+    result = subprocess.run(
+        ["claude", "-p", "--model", model, prompt],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    output = result.stdout.strip()
+    if not output:
+        print(
+            f"{model.capitalize()} returned empty output. "
+            f"stderr: {result.stderr[:500]}",
+            file=sys.stderr,
+        )
+        return output
+
+    if (
+        cache_file is not None
+        and result.returncode == 0
+        and (cacheable is None or cacheable(output))
+    ):
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(".tmp")
+            tmp_file.write_text(output)
+            os.replace(tmp_file, cache_file)
+            _evict_expired(cache_dir, max_age)
+        except OSError as e:
+            print(f"Could not cache {model} response: {e}", file=sys.stderr)
+    return output
+
+
+@cache
+def _evict_expired(cache_dir: Path, max_age: float):
+    """Delete cache entries older than max_age. Runs once per dir per process."""
+    now = time.time()
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            try:
+                if now - entry.stat().st_mtime >= max_age:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+
+
+_MESSAGE_TYPES = frozenset(("user", "assistant"))
+
+# User messages starting with these are tool-injected, not typed prompts
+_SKIP_USER_PREFIXES = ("<shell-maker",)
+
+# Tag prefixes Haiku may reply with, tried in this order (longer OFF variants
+# before bare "OFF"), and the priority level each maps to
+_PRIORITY_LEVELS = {
+    "P0": "P0",
+    "P1": "P1",
+    "P2": "P2",
+    "TOOLING": "TOOLING",
+    "META": "META",
+    "FEATURE": "FEATURE",
+    "BUGFIX": "BUGFIX",
+    "RESEARCH": "RESEARCH",
+    "OFF-PRIORITY": "OFF-PRIORITY",
+    "OFF PRIORITY": "OFF-PRIORITY",
+    "OFFPRIORITY": "OFF-PRIORITY",
+    "OFF": "OFF-PRIORITY",
+    "OTHER": "OTHER",
+}
+_PRIORITY_PREFIX_RE = re.compile("|".join(map(re.escape, _PRIORITY_LEVELS)))
+
+
 def _parse_message_content(msg: dict) -> str:
     """Extract text content from a user or assistant message object."""
     content = msg.get("content", "")
@@ -32,47 +156,81 @@ def _parse_message_content(msg: dict) -> str:
     return ""
 
 
-def extract_messages(session_path: str, with_timestamps: bool = False) -> list[dict]:
+def extract_messages(
+    session_path: str,
+    with_timestamps: bool = False,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> list[dict]:
     """Extract user prompts and assistant text responses from a session file.
 
+    If start/end are given, messages outside [start, end] are skipped before
+    their content is extracted (implies with_timestamps).
+
     Returns list of dicts with keys: role, text, and optionally timestamp.
     """
+    with_timestamps = with_timestamps or start is not None or end is not None
+    start_key = (
+        start.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%S")
+        if start is not None and start.tzinfo is not None
+        else None
+    )
     messages = []
 
     try:
-        f = open(session_path)
+        f = open(session_path, "rb", buffering=READ_BUFFER_SIZE)
     except FileNotFoundError:
         return []
 
     with f:
         for line in f:
+            # Many lines are progress/system/snapshot or tool_use-only
+            # entries; skip them before decoding
+            if not _TYPE_MESSAGE_RE.search(line) or not _TEXT_CONTENT_RE.search(line):
+                continue
             try:
-                obj = json.loads(line)
+                obj = json_loads(line)
+
+                msg_type = obj.get("type")
+                if msg_type not in _MESSAGE_TYPES:
+                    continue
 
                 timestamp = None
                 if with_timestamps:
                     ts_str = obj.get("timestamp")
                     if not ts_str:
                         continue
-                    timestamp = datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
-
-                msg_type = obj.get("type")
-                if msg_type not in ("user", "assistant"):
-                    continue
+                    # Session timestamps are UTC ("...Z"), so whole-second
+                    # prefixes compare lexicographically; skip messages
+                    # clearly before the window without building a datetime
+                    if (
+                        start_key is not None
+                        and ts_str[:19] < start_key
+                        and ts_str.endswith("Z")
+                    ):
+                        continue
+                    timestamp = datetime.fromisoformat(ts_str)
+                    if start is not None and timestamp < start:
+                        continue
+                    # Not a break: resumed sessions and clock adjustments
+                    # can put in-window messages after later ones
+                    if end is not None and timestamp > end:
+                        continue
 
                 inner = obj.get("message", {})
                 if not isinstance(inner, dict):
                     continue
 
                 text = _parse_message_content(inner)
-                if not text.strip():
+                stripped = text.strip()
+                if not stripped:
                     continue
 
                 if msg_type == "user":
-                    if text.startswith("<shell-maker") or len(text.strip()) <= 10:
+                    if len(stripped) <= 10 or text.startswith(_SKIP_USER_PREFIXES):
                         continue
 
-                entry = {"role": msg_type, "text": text.strip()}
+                entry = {"role": msg_type, "text": stripped}
                 if with_timestamps:
                     entry["timestamp"] = timestamp
                 messages.append(entry)
@@ -83,35 +241,103 @@ def extract_messages(session_path: str, with_timestamps: bool = False) -> list[d
     return messages
 
 
-def count_user_turns(session_path: str) -> int:
-    """Count user turns in a session file."""
-    count = 0
-    with open(session_path) as f:
-        for line in f:
-            try:
-                obj = json.loads(line)
-                if obj.get("type") == "user":
+def count_user_turns(session_path: str, stop_at: int | None = None) -> int:
+    """Count user turns in a session file.
+
+    The regex runs over a read-only mmap of the file, so multi-MB sessions
+    are never copied onto the heap; only lines it hits are decoded, to check
+    that "user" is the top-level type. With stop_at, scanning ends once that
+    many turns are found (the result is then a lower bound).
+    """
+    with open(session_path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file; mmap can't map zero bytes
+            return 0
+        with mm:
+            count = 0
+            pos = 0
+            while stop_at is None or count < stop_at:
+                match = _TYPE_USER_RE.search(mm, pos)
+                if match is None:
+                    break
+                line_start = mm.rfind(b"\n", 0, match.start()) + 1
+                line_end = mm.find(b"\n", match.end())
+                if line_end == -1:
+                    line_end = len(mm)
+                if _is_user_entry(mm[line_start:line_end]):
                     count += 1
-            except json.JSONDecodeError:
-                continue
-    return count
+                pos = line_end + 1
+            return count
 
 
-def project_name_from_path(jsonl_path: Path, projects_dir: Path) -> str:
-    """Extract readable project name from a session file path."""
-    rel_path = str(jsonl_path.relative_to(projects_dir))
-    project = rel_path.split("/")[0]
+def _is_user_entry(line: bytes) -> bool:
+    """True if a session JSONL line decodes to a top-level user entry."""
+    try:
+        obj = json_loads(line)
+    except ValueError:
+        return False
+    return isinstance(obj, dict) and obj.get("type") == "user"
+
+
+@cache
+def _project_name(dir_name: str) -> str:
+    """Readable project name for a top-level sessions_dir entry (memoized)."""
+    project = dir_name
     home_prefix = str(Path.home()).replace("/", "-")
     if project.startswith(home_prefix):
         project = project[len(home_prefix) :]
     return project.strip("-").replace("-", "/")
 
 
+def _load_turn_cache(cache_path: Path) -> dict[str, list[int]]:
+    """Load cached {path: [mtime_ns, size, turns, exact]} entries.
+
+    exact is 0 when counting stopped early at min_turns, so turns is only a
+    lower bound. Older three-item entries are exact. A missing, unreadable
+    or corrupt cache file loads as empty, so every file is recounted.
+    """
+    try:
+        cache = json_loads(cache_path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_turn_cache(cache_path: Path, cache: dict[str, list[int]]):
+    """Write the turn cache atomically (tmp file + rename)."""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, cache_path)
+
+
+def _walk_jsonl(root: str) -> Iterator[os.DirEntry]:
+    """Recursively yield *.jsonl entries under root, skipping subagent logs."""
+    try:
+        it = os.scandir(root)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    with it:
+        for entry in it:
+            if "subagents" in entry.path:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_jsonl(entry.path)
+            elif entry.name.endswith(".jsonl"):
+                yield entry
+
+
 def get_sessions(
     min_turns: int = 3, min_size: int = 5000, since: datetime | None = None
 ) -> list[dict]:
     """Get session files, optionally filtered by mtime.
 
+    User-turn counts are cached in reports_dir and only recomputed for
+    files whose mtime or size changed since the last scan. Counting stops
+    at min_turns, since only the threshold is checked.
+
     Args:
         min_turns: Minimum user turns to include.
         min_size: Minimum file size in bytes.
@@ -119,30 +345,51 @@ def get_sessions(
     """
     cfg = load_config()
     projects_dir = cfg["sessions_dir"]
+    cache_path = cfg["reports_dir"] / SESSION_CACHE_NAME
+    cache = _load_turn_cache(cache_path)
+    seen: set[str] = set()
+    cache_dirty = False
     sessions = []
+    # Compare raw epoch seconds so since may be naive (local) or tz-aware
+    since_ts = since.timestamp() if since else None
 
-    for jsonl_file in projects_dir.rglob("*.jsonl"):
-        if "subagents" in str(jsonl_file):
-            continue
-
-        stat = jsonl_file.stat()
+    root = str(projects_dir)
+    root_len = len(root) + 1
+    for dir_entry in _walk_jsonl(root):
+        path = dir_entry.path
+        seen.add(path)
+        stat = dir_entry.stat()
 
         if stat.st_size < min_size:
             continue
 
-        if since:
-            mtime = datetime.fromtimestamp(stat.st_mtime)
-            if mtime < since:
-                continue
+        if since_ts is not None and stat.st_mtime < since_ts:
+            continue
+
+        cached = cache.get(path)
+        if (
+            cached
+            and cached[0] == stat.st_mtime_ns
+            and cached[1] == stat.st_size
+            and (cached[2] >= min_turns or len(cached) < 4 or cached[3])
+        ):
+            turns = cached[2]
+        else:
+            # Only whether turns reaches min_turns matters, so stop there
+            turns = count_user_turns(path, stop_at=min_turns)
+            exact = int(turns < min_turns)
+            cache[path] = [stat.st_mtime_ns, stat.st_size, turns, exact]
+            cache_dirty = True
 
-        turns = count_user_turns(str(jsonl_file))
         if turns < min_turns:
             continue
 
-        project = project_name_from_path(jsonl_file, projects_dir)
+        # _walk_jsonl paths are "<projects_dir>/<project dir>/...", so the
+        # project dir can be sliced out without building a Path
+        project = _project_name(path[root_len:].split("/", 1)[0])
 
         entry = {
-            "path": str(jsonl_file),
+            "path": path,
             "project": project,
             "size_kb": stat.st_size // 1024,
         }
@@ -151,8 +398,21 @@ def get_sessions(
 
         sessions.append(entry)
 
+    # Drop entries for session files that no longer exist
+    stale = cache.keys() - seen
+    if stale:
+        for path in stale:
+            del cache[path]
+        cache_dirty = True
+
+    if cache_dirty:
+        try:
+            _save_turn_cache(cache_path, cache)
+        except OSError as e:
+            print(f"Could not write session cache: {e}", file=sys.stderr)
+
     if since:
-        sessions.sort(key=lambda x: x["mtime"], reverse=True)
+        sessions.sort(key=itemgetter("mtime"), reverse=True)
 
     return sessions
 
@@ -170,6 +430,10 @@ def chunk_conversation(
     messages: list[dict], max_chars: int = 20000
 ) -> list[list[dict]]:
     """Split conversation into chunks that fit in context."""
+    # Common case: the whole conversation fits, so nothing to split or truncate
+    if sum(len(m["text"]) for m in messages) <= max_chars:
+        return [list(messages)] if messages else []
+
     chunks = []
     current_chunk = []
     current_size = 0
@@ -183,10 +447,8 @@ def chunk_conversation(
             current_size = 0
 
         if msg_size > max_chars:
-            msg = {
-                "role": msg["role"],
-                "text": msg["text"][:max_chars] + "...[truncated]",
-            }
+            # Copy (keeping any extra keys) rather than mutate the caller's dict
+            msg = {**msg, "text": msg["text"][:max_chars] + "...[truncated]"}
             msg_size = max_chars
 
         current_chunk.append(msg)
@@ -207,22 +469,11 @@ def format_chunk(chunk: list[dict]) -> str:
     return "\n".join(lines)
 
 
-def summarize_and_tag_chunk(chunk: list[dict], project: str, priorities: str) -> dict:
-    """Use haiku to summarize AND tag a chunk with priority.
-
-    Returns dict with:
-      - priority: P0/P1/P2/OFF-PRIORITY/UNCLEAR
-      - priority_name: short description of which priority
-      - summary: 2-3 bullet summary
-      - user_chars: character count of user messages in chunk
-      - user_turns: number of user messages in chunk
-    """
-    chunk_text = format_chunk(chunk)
-    user_chars = sum(len(m["text"]) for m in chunk if m["role"] == "user")
-    user_turns = sum(1 for m in chunk if m["role"] == "user")
-
+@lru_cache(maxsize=4)
+def _priority_instructions(priorities: str) -> str:
+    """Tagging instructions for a priorities file, built once per distinct text."""
     if priorities:
-        priority_instructions = f"""1. Which priority does this work DIRECTLY relate to? Be conservative - only match if the work clearly fits a priority. Reply with exactly one of:
+        return f"""1. Which priority does this work DIRECTLY relate to? Be conservative - only match if the work clearly fits a priority. Reply with exactly one of:
    - P0: [which P0 priority, verbatim from list]
    - P1: [which P1 priority, verbatim from list]
    - P2: [which P2 priority, verbatim from list]
@@ -235,8 +486,7 @@ Do NOT stretch to fit. If it's tangentially related or infrastructure work, use
 
 ## Priorities Reference (includes project context)
 {priorities}"""
-    else:
-        priority_instructions = """1. Categorize the work. Reply with exactly one of:
+    return """1. Categorize the work. Reply with exactly one of:
    - TOOLING: [brief description] - for dev tools, configs, infrastructure
    - META: [brief description] - for planning, project management
    - FEATURE: [brief description] - for feature work
@@ -244,6 +494,41 @@ Do NOT stretch to fit. If it's tangentially related or infrastructure work, use
    - RESEARCH: [brief description] - for exploration, investigation
    - OTHER: [brief description] - anything else"""
 
+
+def _parse_priority_line(priority_line: str) -> tuple[str, str]:
+    """Split a PRIORITY: answer into (level, name); UNCLEAR if unrecognized."""
+    match = _PRIORITY_PREFIX_RE.match(priority_line.upper())
+    if not match:
+        return "UNCLEAR", priority_line
+    prefix = match.group()
+    return _PRIORITY_LEVELS[prefix], priority_line[len(prefix) :].strip(": -")
+
+
+def _has_priority_line(output: str) -> bool:
+    """True if a Haiku reply carries the PRIORITY: line the parser looks for."""
+    return any(line.startswith("PRIORITY:") for line in output.split("\n"))
+
+
+def summarize_and_tag_chunk(chunk: list[dict], project: str, priorities: str) -> dict:
+    """Use haiku to summarize AND tag a chunk with priority.
+
+    Returns dict with:
+      - priority: P0/P1/P2/OFF-PRIORITY/UNCLEAR
+      - priority_name: short description of which priority
+      - summary: 2-3 bullet summary
+      - user_chars: character count of user messages in chunk
+      - user_turns: number of user messages in chunk
+    """
+    chunk_text = format_chunk(chunk)
+    user_chars = 0
+    user_turns = 0
+    for m in chunk:
+        if m["role"] == "user":
+            user_chars += len(m["text"])
+            user_turns += 1
+
+    priority_instructions = _priority_instructions(priorities)
+
     prompt = f"""Analyze this conversation chunk.
 
 {priority_instructions}
@@ -259,14 +544,18 @@ SUMMARY:
 - bullet 1
 - bullet 2"""
 
+    cfg = load_config()
+    cache_dir = cfg["reports_dir"] / HAIKU_CACHE_DIR
+
     try:
-        result = subprocess.run(
-            ["claude", "-p", "--model", "haiku", prompt],
-            capture_output=True,
-            text=True,
-            timeout=120,
+        output = run_claude(
+            prompt,
+            "haiku",
+            120,
+            cache_dir,
+            cfg["haiku_cache_days"],
+            cacheable=_has_priority_line,
         )
-        output = result.stdout.strip()
 
         priority_line = "UNCLEAR"
         summary_lines = []
@@ -280,31 +569,7 @@ SUMMARY:
             elif in_summary:
                 summary_lines.append(line)
 
-        priority_level = "UNCLEAR"
-        priority_name = priority_line
-        upper_line = priority_line.upper()
-        for p in [
-            "P0",
-            "P1",
-            "P2",
-            "TOOLING",
-            "META",
-            "FEATURE",
-            "BUGFIX",
-            "RESEARCH",
-            "OFF-PRIORITY",
-            "OFF PRIORITY",
-            "OFFPRIORITY",
-            "OFF",
-            "OTHER",
-        ]:
-            if upper_line.startswith(p):
-                if "OFF" in p:
-                    priority_level = "OFF-PRIORITY"
-                else:
-                    priority_level = p
-                priority_name = priority_line[len(p) :].strip(": -")
-                break
+        priority_level, priority_name = _parse_priority_line(priority_line)
 
         return {
             "priority": priority_level,
@@ -40,6 +40,14 @@ class TestTimezoneConversion:
             for h in range(24):
                 assert _utc_hour_to_local(h, "2026-02-15") == h
 
+    def test_utc_hour_to_local_dst_transition(self):
+        from charts import _utc_hour_to_local
+
+        with patch("charts.load_config", return_value={"timezone": "US/Pacific"}):
+            # 2026-03-08: PST -> PDT at 10:00 UTC
+            assert _utc_hour_to_local(9, "2026-03-08") == 1
+            assert _utc_hour_to_local(10, "2026-03-08") == 3
+
     def test_hourly_chart_rebuckets_to_local(self):
         """The hourly bar chart should aggregate UTC hours into local-time buckets."""
         from charts import chart_by_hour_of_day
@@ -111,6 +119,15 @@ class TestDateFlag:
 # --- Priority consolidation preserves turns ---
 
 
+@pytest.fixture
+def opus_cache_in_tmp(tmp_path):
+    """Point the Opus response cache at tmp_path instead of the real reports_dir."""
+    cfg = {"reports_dir": tmp_path, "opus_cache_days": 7}
+    with patch("daily_report.load_config", return_value=cfg):
+        yield
+
+
+@pytest.mark.usefixtures("opus_cache_in_tmp")
 class TestPriorityConsolidation:
     """Opus groups items by index, Python sums turns. Total is preserved."""
 
@@ -185,6 +202,32 @@ class TestPriorityConsolidation:
         result, total = self._run_consolidation(breakdown, opus_json)
         assert sum(r["turns"] for r in result) == total == 100
 
+    def test_turns_preserved_with_surrounding_prose(self):
+        """Leading or trailing commentary around the JSON is ignored."""
+        breakdown = [
+            {"name": "P0: A", "turns": 40, "pct": 20.0},
+            {"name": "P0: A v2", "turns": 30, "pct": 15.0},
+            {"name": "P1: B", "turns": 50, "pct": 25.0},
+            {"name": "P1: B [followup]", "turns": 20, "pct": 10.0},
+            {"name": "TOOLING: C", "turns": 40, "pct": 20.0},
+            {"name": "META: D", "turns": 20, "pct": 10.0},
+        ]
+        opus_json = (
+            "Here are the groups [by priority]:\n"
+            + json.dumps(
+                [
+                    {"name": "P0: A", "items": [0, 1]},
+                    {"name": "P1: B", "items": [2, 3]},
+                    {"name": "TOOLING: C", "items": [4]},
+                    {"name": "META: D", "items": [5]},
+                ]
+            )
+            + "\nLet me know if you want finer [or coarser] groups."
+        )
+        result, total = self._run_consolidation(breakdown, opus_json)
+        assert sum(r["turns"] for r in result) == total == 200
+        assert len(result) == 4
+
     def test_small_breakdown_skips_consolidation(self):
         """<=5 items should be returned as-is (no Opus call)."""
         from daily_report import consolidate_priority_names
@@ -219,6 +262,164 @@ class TestPriorityConsolidation:
         assert p0["pct"] == 50.0
 
 
+# --- Project consolidation keeps order and falls back per project ---
+
+
+@pytest.mark.usefixtures("opus_cache_in_tmp")
+class TestProjectConsolidation:
+    """Opus project summaries run in parallel but keep the input order."""
+
+    def test_order_preserved_and_failures_fall_back(self):
+        import subprocess
+
+        from daily_report import consolidate_with_opus
+
+        projects = [
+            {"project": f"proj-{i}", "chars": 100 - i, "summaries": [f"raw {i}"]}
+            for i in range(12)
+        ]
+        projects[3]["summaries"] = ["(no content)"]
+
+        def fake_run(cmd, **kwargs):
+            if "proj-5" in cmd[-1]:
+                raise subprocess.TimeoutExpired(cmd, 600)
+            name = next(p["project"] for p in projects if p["project"] in cmd[-1])
+            return subprocess.CompletedProcess(
+                args=cmd, returncode=0, stdout=f"- done {name}", stderr=""
+            )
+
+        warnings: list[str] = []
+        with patch("daily_report.subprocess.run", side_effect=fake_run):
+            result = consolidate_with_opus(projects, "", warnings)
+
+        assert [r["project"] for r in result] == [p["project"] for p in projects]
+        assert result[0]["summaries"] == ["- done proj-0"]
+        assert result[3] is projects[3]
+        assert result[5] is projects[5]
+        assert result[11] is projects[11]
+        assert len(warnings) == 1
+
+
+class TestOpusCache:
+    """Identical Opus and Haiku prompts are answered from the on-disk cache."""
+
+    def test_repeat_prompt_hits_cache(self, tmp_path):
+        import subprocess
+
+        from daily_report import _cached_opus
+
+        cfg = {"reports_dir": tmp_path, "opus_cache_days": 7}
+        mock_result = subprocess.CompletedProcess(
+            args=[], returncode=0, stdout="- summary\n", stderr=""
+        )
+        with (
+            patch("daily_report.load_config", return_value=cfg),
+            patch("daily_report.subprocess.run", return_value=mock_result) as run,
+        ):
+            assert _cached_opus("same prompt") == "- summary"
+            assert _cached_opus("same prompt") == "- summary"
+            assert _cached_opus("other prompt") == "- summary"
+        assert run.call_count == 2
+
+    def test_empty_output_not_cached(self, tmp_path):
+        import subprocess
+
+        from daily_report import _cached_opus
+
+        cfg = {"reports_dir": tmp_path, "opus_cache_days": 7}
+        empty = subprocess.CompletedProcess(args=[], returncode=1, stdout="", stderr="")
+        with (
+            patch("daily_report.load_config", return_value=cfg),
+            patch("daily_report.subprocess.run", return_value=empty) as run,
+        ):
+            assert _cached_opus("prompt") == ""
+            assert _cached_opus("prompt") == ""
+        assert run.call_count == 2
+
+    def test_failed_or_unparseable_output_not_cached(self, tmp_path):
+        import subprocess
+
+        from daily_report import _cached_opus, _is_json_array
+
+        cfg = {"reports_dir": tmp_path, "opus_cache_days": 7}
+        overloaded = subprocess.CompletedProcess(
+            args=[], returncode=1, stdout="API Error: 529 Overloaded", stderr=""
+        )
+        prose = subprocess.CompletedProcess(
+            args=[], returncode=0, stdout="Sorry, I can't group these.", stderr=""
+        )
+        with patch("daily_report.load_config", return_value=cfg):
+            with patch("daily_report.subprocess.run", return_value=overloaded) as run:
+                _cached_opus("prompt")
+                _cached_opus("prompt")
+            assert run.call_count == 2
+            with patch("daily_report.subprocess.run", return_value=prose) as run:
+                _cached_opus("prompt", cacheable=_is_json_array)
+                _cached_opus("prompt", cacheable=_is_json_array)
+            assert run.call_count == 2
+
+    def test_expired_entries_evicted_on_write(self, tmp_path):
+        import os
+        import subprocess
+        import time
+
+        from sessions import run_claude
+
+        stale = tmp_path / "stale.txt"
+        stale.write_text("old")
+        old = time.time() - 2 * 86400
+        os.utime(stale, (old, old))
+        fresh = tmp_path / "fresh.txt"
+        fresh.write_text("new")
+
+        ok = subprocess.CompletedProcess(args=[], returncode=0, stdout="x", stderr="")
+        with patch("sessions.subprocess.run", return_value=ok):
+            run_claude("prompt", "opus", 600, tmp_path, 1)
+        assert not stale.exists()
+        assert fresh.exists()
+
+    def test_haiku_chunk_tags_cached(self, tmp_path):
+        import subprocess
+
+        from sessions import summarize_and_tag_chunk
+
+        cfg = {"reports_dir": tmp_path, "haiku_cache_days": 30}
+        mock_result = subprocess.CompletedProcess(
+            args=[],
+            returncode=0,
+            stdout="PRIORITY: TOOLING: ci\nSUMMARY:\n- fixed ci",
+            stderr="",
+        )
+        chunk = [{"role": "user", "text": "please fix the ci config"}]
+        with (
+            patch("sessions.load_config", return_value=cfg),
+            patch("sessions.subprocess.run", return_value=mock_result) as run,
+        ):
+            first = summarize_and_tag_chunk(chunk, "proj", "")
+            second = summarize_and_tag_chunk(chunk, "proj", "")
+        assert run.call_count == 1
+        assert first == second
+        assert first["priority"] == "TOOLING"
+
+    def test_haiku_reply_without_priority_not_cached(self, tmp_path):
+        import subprocess
+
+        from sessions import summarize_and_tag_chunk
+
+        cfg = {"reports_dir": tmp_path, "haiku_cache_days": 30}
+        mock_result = subprocess.CompletedProcess(
+            args=[], returncode=0, stdout="Rate limit reached", stderr=""
+        )
+        chunk = [{"role": "user", "text": "please fix the ci config"}]
+        with (
+            patch("sessions.load_config", return_value=cfg),
+            patch("sessions.subprocess.run", return_value=mock_result) as run,
+        ):
+            summarize_and_tag_chunk(chunk, "proj", "")
+            summarize_and_tag_chunk(chunk, "proj", "")
+        assert run.call_count == 2
+
+
 # --- Weekly aggregation preserves all turns ---
 
 
@@ -304,6 +505,37 @@ class TestWeeklyAggregation:
         assert projects["proj-a"] == 12000
         assert projects["proj-b"] == 3000
 
+    def test_load_skips_reports_outside_window(self, tmp_path, capsys):
+        """Old daily files are rejected by name, before they are parsed or read."""
+        from pathlib import Path
+
+        from weekly_summary import load_daily_reports
+
+        daily = tmp_path / "daily"
+        daily.mkdir()
+        today = datetime.now().strftime("%Y-%m-%d")
+        (daily / f"{today}.json").write_text(json.dumps({"projects": []}))
+        (daily / "2001-01-01.json").write_text("not json")
+        # Not a valid date; only reaches fromisoformat if the name check fails
+        (daily / "2001-13-01.json").write_text("not json")
+
+        read_bytes = Path.read_bytes
+        read_paths = []
+
+        def recording_read_bytes(path):
+            read_paths.append(path.name)
+            return read_bytes(path)
+
+        with (
+            patch("weekly_summary.load_config", return_value={"reports_dir": tmp_path}),
+            patch.object(Path, "read_bytes", recording_read_bytes),
+        ):
+            reports = load_daily_reports(days=7)
+
+        assert [r["_date"] for r in reports] == [today]
+        assert read_paths == [f"{today}.json"]
+        assert "Skipping" not in capsys.readouterr().err
+
 
 # --- Charts render from hourly data ---
 
@@ -373,6 +605,12 @@ class TestCharts:
             assert chart_by_day(empty) == b""
             assert chart_time_series(empty) == b""
 
+        no_priorities = [
+            {"_date": "2026-02-15", "hourly_breakdown": [{"hour": 9, "priorities": {}}]}
+        ]
+        with patch("charts.load_config", return_value={"timezone": "US/Pacific"}):
+            assert chart_by_hour_of_day(no_priorities) == b""
+
     def test_generate_all_charts(self):
         from charts import generate_all_charts
 
@@ -385,6 +623,66 @@ class TestCharts:
             assert png[:8] == b"\x89PNG\r\n\x1a\n"
 
 
+# --- Report pipeline tags each distinct chunk once ---
+
+
+class TestGenerateReport:
+    """Parsed sessions are tagged per chunk; duplicate chunks share one call."""
+
+    def test_identical_chunks_tagged_once(self, tmp_path):
+        from daily_report import generate_report
+
+        def write_session(name, hour):
+            lines = [
+                {
+                    "type": "user",
+                    "timestamp": f"2026-02-15T{hour:02d}:0{i}:00Z",
+                    "message": {"content": text},
+                }
+                for i, text in enumerate(
+                    ["please fix the flaky test", "now update the changelog"]
+                )
+            ]
+            path = tmp_path / name
+            path.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+            return {"path": str(path), "project": "proj"}
+
+        sessions = [write_session("a.jsonl", 10), write_session("b.jsonl", 15)]
+        cfg = {"reports_dir": tmp_path, "haiku_cache_days": 30}
+        calls = []
+
+        def fake_run_claude(prompt, *args, **kwargs):
+            calls.append(prompt)
+            return "PRIORITY: P0: tests\nSUMMARY:\n- fixed tests"
+
+        with (
+            patch("daily_report.get_sessions", return_value=sessions),
+            patch("daily_report.load_priorities", return_value=""),
+            patch("daily_report.collect_git_logs", return_value={}),
+            patch("daily_report.collect_todos", return_value={}),
+            patch("daily_report.consolidate_with_opus", side_effect=lambda p, *a: p),
+            patch("sessions.load_config", return_value=cfg),
+            patch("sessions.run_claude", side_effect=fake_run_claude),
+        ):
+            report = generate_report(
+                datetime(2026, 2, 15, tzinfo=ZoneInfo("UTC")),
+                datetime(2026, 2, 16, tzinfo=ZoneInfo("UTC")),
+            )
+
+        assert len(calls) == 1
+        assert report["total_sessions_with_activity"] == 2
+        bd = report["priority_breakdown"]
+        assert bd["total_user_turns"] == 4
+        assert bd["total_user_chars"] == 2 * (
+            len("please fix the flaky test") + len("now update the changelog")
+        )
+        assert report["hourly_breakdown"] == [
+            {"hour": 10, "priorities": {"P0": 2}},
+            {"hour": 15, "priorities": {"P0": 2}},
+        ]
+        assert report["projects"][0]["summaries"] == ["- fixed tests"] * 2
+
+
 # --- Report structure ---
 
 
@@ -452,3 +750,198 @@ class TestReportStructure:
             assert "hour" in entry
             assert "priorities" in entry
             assert 0 <= entry["hour"] <= 23
+
+
+# --- Session scanning ---
+
+
+class TestCountUserTurns:
+    """count_user_turns counts top-level user entries only."""
+
+    def test_counts_user_entries_only(self, tmp_path):
+        from sessions import count_user_turns
+
+        lines = [
+            {"type": "user", "message": {"role": "user", "content": "hello there"}},
+            {"type": "assistant", "message": {"role": "assistant", "content": "hi"}},
+            {
+                "type": "user",
+                "message": {"content": 'pasted {"type":"user"} json snippet'},
+            },
+            {"type": "summary", "summary": "x"},
+            {"type": "progress", "data": {"message": {"type": "user", "text": "x"}}},
+        ]
+        path = tmp_path / "session.jsonl"
+        path.write_text(
+            "\n".join(json.dumps(line, separators=(",", ":")) for line in lines) + "\n"
+        )
+        assert count_user_turns(str(path)) == 2
+        assert count_user_turns(str(path), stop_at=1) == 1
+
+
+class TestSessionTurnCache:
+    """Turn counts are reused for unchanged session files across scans."""
+
+    def test_unchanged_files_not_recounted(self, tmp_path):
+        import sessions
+
+        sessions_dir = tmp_path / "projects"
+        (sessions_dir / "-proj").mkdir(parents=True)
+        session = sessions_dir / "-proj" / "a.jsonl"
+        line = json.dumps({"type": "user", "message": {"content": "x" * 2000}})
+        session.write_text((line + "\n") * 4)
+
+        cfg = {"sessions_dir": sessions_dir, "reports_dir": tmp_path / "reports"}
+        with patch("sessions.load_config", return_value=cfg):
+            first = sessions.get_sessions()
+            with patch(
+                "sessions.count_user_turns", side_effect=AssertionError
+            ) as counter:
+                second = sessions.get_sessions()
+            assert counter.call_count == 0
+
+            session.write_text((line + "\n") * 5)
+            with patch("sessions.count_user_turns", return_value=5) as counter:
+                sessions.get_sessions()
+            assert counter.call_count == 1
+
+        assert first == second
+        assert len(first) == 1
+
+    @pytest.mark.parametrize("contents", [b"\xff\xfe{", b"[]", b"{"])
+    def test_corrupt_cache_loads_empty(self, tmp_path, contents):
+        import json as stdlib_json
+
+        import sessions
+
+        cache_path = tmp_path / sessions.SESSION_CACHE_NAME
+        cache_path.write_bytes(contents)
+        # Also exercise the stdlib decoder, which raises UnicodeDecodeError
+        for loads in (sessions.json_loads, stdlib_json.loads):
+            with patch("sessions.json_loads", loads):
+                assert sessions._load_turn_cache(cache_path) == {}
+
+    def test_lower_bound_recounted_for_higher_threshold(self, tmp_path):
+        import sessions
+
+        sessions_dir = tmp_path / "projects"
+        (sessions_dir / "-proj").mkdir(parents=True)
+        line = json.dumps({"type": "user", "message": {"content": "x" * 2000}})
+        (sessions_dir / "-proj" / "a.jsonl").write_text((line + "\n") * 6)
+
+        cfg = {"sessions_dir": sessions_dir, "reports_dir": tmp_path / "reports"}
+        with patch("sessions.load_config", return_value=cfg):
+            assert len(sessions.get_sessions(min_turns=3)) == 1
+            # Cached count stopped at 3, so a higher threshold must recount
+            assert len(sessions.get_sessions(min_turns=6)) == 1
+            assert len(sessions.get_sessions(min_turns=7)) == 0
+
+    def test_since_skips_files_last_written_before_window(self, tmp_path):
+        import os
+
+        import sessions
+
+        sessions_dir = tmp_path / "projects"
+        (sessions_dir / "-proj").mkdir(parents=True)
+        line = json.dumps({"type": "user", "message": {"content": "x" * 2000}})
+        for name in ("old.jsonl", "new.jsonl"):
+            (sessions_dir / "-proj" / name).write_text((line + "\n") * 4)
+        since = datetime(2026, 2, 15, tzinfo=ZoneInfo("UTC"))
+        old_mtime = (since - timedelta(days=1)).timestamp()
+        os.utime(sessions_dir / "-proj" / "old.jsonl", (old_mtime, old_mtime))
+
+        cfg = {"sessions_dir": sessions_dir, "reports_dir": tmp_path / "reports"}
+        with patch("sessions.load_config", return_value=cfg):
+            found = sessions.get_sessions(since=since)
+
+        assert [s["path"].rsplit("/", 1)[-1] for s in found] == ["new.jsonl"]
+
+
+class TestExtractMessagesWindow:
+    """Messages outside [start, end] are dropped during parsing."""
+
+    def test_window_filter(self, tmp_path):
+        from sessions import extract_messages
+
+        utc = ZoneInfo("UTC")
+        lines = [
+            {
+                "type": "user",
+                "timestamp": f"2026-02-15T{h:02d}:00:00Z",
+                "message": {"content": f"message at hour {h}"},
+            }
+            for h in (1, 5, 9)
+        ]
+        path = tmp_path / "session.jsonl"
+        path.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+
+        start = datetime(2026, 2, 15, 4, tzinfo=utc)
+        end = datetime(2026, 2, 15, 9, tzinfo=utc)
+        messages = extract_messages(str(path), start=start, end=end)
+
+        assert [m["timestamp"].hour for m in messages] == [5, 9]
+
+    def test_out_of_order_line_does_not_end_scan(self, tmp_path):
+        from sessions import extract_messages
+
+        utc = ZoneInfo("UTC")
+        lines = [
+            {
+                "type": "user",
+                "timestamp": f"2026-02-15T{h:02d}:00:00Z",
+                "message": {"content": f"message at hour {h}"},
+            }
+            for h in (5, 12, 6)
+        ]
+        path = tmp_path / "session.jsonl"
+        path.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+
+        start = datetime(2026, 2, 15, 4, tzinfo=utc)
+        end = datetime(2026, 2, 15, 9, tzinfo=utc)
+        messages = extract_messages(str(path), start=start, end=end)
+
+        assert [m["timestamp"].hour for m in messages] == [5, 6]
+
+
+class TestPriorityLineParsing:
+    """Haiku's PRIORITY: answer maps to a level plus the free-text name."""
+
+    @pytest.mark.parametrize(
+        "line,expected",
+        [
+            ("P0: Migrate billing", ("P0", "Migrate billing")),
+            ("tooling - CI fixes", ("TOOLING", "CI fixes")),
+            ("OFF PRIORITY: music", ("OFF-PRIORITY", "music")),
+            ("OffPriority: music", ("OFF-PRIORITY", "music")),
+            ("OFF: music", ("OFF-PRIORITY", "music")),
+            ("**P0**: bold", ("UNCLEAR", "**P0**: bold")),
+        ],
+    )
+    def test_parse_priority_line(self, line, expected):
+        from sessions import _parse_priority_line
+
+        assert _parse_priority_line(line) == expected
+
+
+class TestExtractMessagesWindowBoundary:
+    """The string fast path never drops messages inside the window."""
+
+    def test_subsecond_and_offset_timestamps(self, tmp_path):
+        from sessions import extract_messages
+
+        stamps = [
+            "2026-02-15T03:59:59.999Z",  # just before start
+            "2026-02-15T04:00:00.500Z",  # same second as start, after it
+            "2026-02-15T04:30:00+00:00",  # non-"Z" UTC offset
+        ]
+        lines = [
+            {"type": "user", "timestamp": ts, "message": {"content": f"msg {ts}"}}
+            for ts in stamps
+        ]
+        path = tmp_path / "session.jsonl"
+        path.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+
+        start = datetime(2026, 2, 15, 4, tzinfo=ZoneInfo("UTC"))
+        messages = extract_messages(str(path), start=start)
+
+        assert [m["text"] for m in messages] == [f"msg {ts}" for ts in stamps[1:]]
@@ -6,12 +6,15 @@ Shows trends and totals.
 """
 
 import argparse
-import json
+import heapq
 import sys
+from collections import defaultdict
 from datetime import datetime, timedelta
+from operator import itemgetter
 from pathlib import Path
 
 from config import load_config
+from jsonio import dumps_report, json_loads
 
 
 def load_daily_reports(days: int = 7) -> list[dict]:
@@ -22,17 +25,22 @@ def load_daily_reports(days: int = 7) -> list[dict]:
         return []
 
     cutoff = datetime.now() - timedelta(days=days)
+    # ISO stems sort chronologically, so older files are rejected by name alone
+    cutoff_stem = cutoff.strftime("%Y-%m-%d")
     reports = []
 
-    for f in sorted(daily_dir.glob("*.json")):
+    # Daily reports are named YYYY-MM-DD.json; the glob skips anything else
+    for f in sorted(daily_dir.glob("????-??-??.json")):
+        if f.stem < cutoff_stem:
+            continue
         try:
-            date = datetime.strptime(f.stem, "%Y-%m-%d")
+            # C-level ISO parser; raises ValueError for stems like 2026-13-01
+            date = datetime.fromisoformat(f.stem)
             if date >= cutoff:
-                with open(f) as fp:
-                    report = json.load(fp)
-                    report["_date"] = f.stem
-                    reports.append(report)
-        except (ValueError, json.JSONDecodeError) as e:
+                report = json_loads(f.read_bytes())
+                report["_date"] = f.stem
+                reports.append(report)
+        except ValueError as e:
             print(f"Skipping {f}: {e}", file=sys.stderr)
 
     return reports
@@ -43,13 +51,17 @@ def aggregate_reports(reports: list[dict]) -> dict:
     if not reports:
         return {"error": "No daily reports found"}
 
-    total_turns: dict[str, int] = {}
-    total_chars: dict[str, int] = {}
-    total_chunks: dict[str, int] = {}
+    total_turns: dict[str, int] = defaultdict(int)
+    total_chars: dict[str, int] = defaultdict(int)
+    total_chunks: dict[str, int] = defaultdict(int)
+    priority_names: dict[str, int] = defaultdict(int)
+    project_chars: dict[str, int] = defaultdict(int)
     grand_total_turns = 0
     grand_total_chars = 0
     daily_pct = []
 
+    # One pass over the reports accumulates every per-priority, per-name and
+    # per-project total
     for r in reports:
         breakdown = r.get("priority_breakdown", {})
         turns = breakdown.get("by_user_turns", {})
@@ -57,11 +69,11 @@ def aggregate_reports(reports: list[dict]) -> dict:
         chunks = breakdown.get("by_chunk_count", {})
 
         for p, v in turns.items():
-            total_turns[p] = total_turns.get(p, 0) + v
+            total_turns[p] += v
         for p, v in chars.items():
-            total_chars[p] = total_chars.get(p, 0) + v
+            total_chars[p] += v
         for p, v in chunks.items():
-            total_chunks[p] = total_chunks.get(p, 0) + v
+            total_chunks[p] += v
 
         grand_total_turns += breakdown.get("total_user_turns", 0)
         grand_total_chars += breakdown.get("total_user_chars", 0)
@@ -75,20 +87,17 @@ def aggregate_reports(reports: list[dict]) -> dict:
             }
         )
 
+        for item in breakdown.get("by_priority_name", []):
+            priority_names[item["name"]] += item.get("turns", item.get("chars", 0))
+
+        for proj in r.get("projects", []):
+            project_chars[proj["project"]] += proj["chars"]
+
     overall_pct = {
         p: round(100 * t / grand_total_turns, 1) if grand_total_turns > 0 else 0
         for p, t in total_turns.items()
     }
 
-    # Aggregate priority names
-    priority_names: dict[str, int] = {}
-    for r in reports:
-        for item in r.get("priority_breakdown", {}).get("by_priority_name", []):
-            name = item["name"]
-            priority_names[name] = priority_names.get(name, 0) + item.get(
-                "turns", item.get("chars", 0)
-            )
-
     all_priority_items = sorted(
         [
             {
@@ -100,7 +109,8 @@ def aggregate_reports(reports: list[dict]) -> dict:
             }
             for k, v in priority_names.items()
         ],
-        key=lambda x: -x["turns"],
+        key=itemgetter("turns"),
+        reverse=True,
     )
 
     # Re-consolidate priority names across days (daily reports use different names)
@@ -110,26 +120,20 @@ def aggregate_reports(reports: list[dict]) -> dict:
         :20
     ]
 
-    # Aggregate projects
-    project_chars: dict[str, int] = {}
-    for r in reports:
-        for proj in r.get("projects", []):
-            name = proj["project"]
-            project_chars[name] = project_chars.get(name, 0) + proj["chars"]
-
-    top_projects = sorted(
-        [{"project": k, "chars": v} for k, v in project_chars.items()],
-        key=lambda x: -x["chars"],
-    )[:10]
+    top_projects = heapq.nlargest(
+        10,
+        ({"project": k, "chars": v} for k, v in project_chars.items()),
+        key=itemgetter("chars"),
+    )
 
     return {
         "period_start": reports[0].get("_date") if reports else None,
         "period_end": reports[-1].get("_date") if reports else None,
         "days_covered": len(reports),
         "priority_breakdown": {
-            "by_user_turns": total_turns,
-            "by_user_chars": total_chars,
-            "by_chunk_count": total_chunks,
+            "by_user_turns": dict(total_turns),
+            "by_user_chars": dict(total_chars),
+            "by_chunk_count": dict(total_chunks),
             "percentage_of_effort": overall_pct,
             "by_priority_name": top_priorities,
             "total_user_turns": grand_total_turns,
@@ -140,8 +144,8 @@ def aggregate_reports(reports: list[dict]) -> dict:
     }
 
 
-def save_report(report: dict, date: datetime):
-    """Save weekly report."""
+def save_report(report: dict, date: datetime, data: bytes | None = None):
+    """Save weekly report. `data` is dumps_report(report) if already built."""
     cfg = load_config()
     dir_path = cfg["reports_dir"] / "weekly"
     dir_path.mkdir(parents=True, exist_ok=True)
@@ -149,8 +153,9 @@ def save_report(report: dict, date: datetime):
     filename = date.strftime("%Y-%m-%d") + ".json"
     filepath = dir_path / filename
 
-    with open(filepath, "w") as f:
-        json.dump(report, f, indent=2)
+    if data is None:
+        data = dumps_report(report)
+    filepath.write_bytes(data)
 
     print(f"Saved to {filepath}", file=sys.stderr)
     return filepath
@@ -170,7 +175,7 @@ def email_report(
         "## Overall Priority Breakdown (by turns)",
     ]
 
-    for p, val in sorted(pct.items(), key=lambda x: -x[1]):
+    for p, val in sorted(pct.items(), key=itemgetter(1), reverse=True):
         if val > 0:
             lines.append(f"- **{p}**: {val}%")
 
@@ -178,9 +183,7 @@ def email_report(
     lines.append("## Daily Trend")
 
     for day in report["daily_trend"]:
-        top_pct = (
-            max(day["pct"].items(), key=lambda x: x[1]) if day["pct"] else ("?", 0)
-        )
+        top_pct = max(day["pct"].items(), key=itemgetter(1)) if day["pct"] else ("?", 0)
         lines.append(
             f"- {day['date']}: top={top_pct[0]} ({top_pct[1]}%), {day.get('total_turns', 0)} turns"
         )
@@ -243,8 +246,11 @@ def main():
 
     summary = aggregate_reports(reports)
 
+    # Serialized once for both the saved file and stdout
+    data = dumps_report(summary)
+
     if not args.no_save:
-        save_report(summary, datetime.now())
+        save_report(summary, datetime.now(), data)
 
     if args.email:
         subject = (
@@ -252,7 +258,8 @@ def main():
         )
         email_report(summary, subject, args.email, daily_reports=reports)
 
-    print(json.dumps(summary, indent=2))
+    sys.stdout.flush()
+    sys.stdout.buffer.write(data + b"\n")
 
 
 if __name__ == "__main__":